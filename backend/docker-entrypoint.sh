@@ -9,6 +9,10 @@ python manage.py migrate --noinput
 echo "Ensuring default user exists..."
 python manage.py create_default_user
 
+# Store any .alog uploads interrupted by a restart
+echo "Finalizing staged .alog uploads..."
+python manage.py finalize_alog_uploads
+
 # Start gunicorn
 echo "Starting gunicorn..."
 exec gunicorn --bind 0.0.0.0:8000 --workers 2 roasttracker.wsgi:application
@@ -8,7 +8,11 @@ class RoastAdmin(admin.ModelAdmin):
     list_filter = ['roast_date', 'operator', 'heavy_fc', 'low_fc']
     search_fields = ['title', 'beans', 'operator', 'roasting_notes', 'cupping_notes']
     readonly_fields = ['id', 'roast_uuid', 'created_at', 'updated_at']
-    date_hierarchy = 'roast_date'
+    # No date_hierarchy: its per-page date aggregation scans the whole table;
+    # list_filter on roast_date covers date navigation
+    list_per_page = 50
+    # Skip the unfiltered COUNT(*) on filtered/searched changelist pages
+    show_full_result_count = False
 
     fieldsets = (
         ('Basic Information', {
@@ -54,3 +58,7 @@ class RoastAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at')
         }),
     )
+
+    def get_queryset(self, request):
+        # None of the admin views show the raw data or time series blobs
+        return super().get_queryset(request).defer('raw_data', 'timex_data', 'temp1_data', 'temp2_data')
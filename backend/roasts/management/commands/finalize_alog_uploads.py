@@ -0,0 +1,17 @@
+"""
+Django management command to store uploaded .alog files left in staging
+"""
+from django.core.management.base import BaseCommand
+
+from roasts.tasks import finalize_staged_alog_files
+
+
+class Command(BaseCommand):
+    help = 'Move staged .alog uploads into storage and attach them to their roasts'
+
+    def handle(self, *args, **options):
+        finalized, failed = finalize_staged_alog_files()
+
+        self.stdout.write(self.style.SUCCESS(f'Finalized {finalized} staged .alog files'))
+        if failed:
+            self.stdout.write(self.style.ERROR(f'Failed to finalize {failed} staged .alog files'))
@@ -1,13 +1,24 @@
 """
 Django management command to bulk import .alog files from a directory
 """
-from django.core.management.base import BaseCommand
+from concurrent.futures import ProcessPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
 from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from pathlib import Path
 import os
 
 from roasts.models import Roast
-from roasts.parsers import parse_alog_file
+from roasts.parsers import READ_BUFFER_SIZE, parse_alog_file
+
+
+# Columns rewritten when re-importing an existing roast (everything but its identity)
+MUTABLE_FIELDS = tuple(
+    field.name for field in Roast._meta.concrete_fields
+    if field.name not in ('id', 'roast_uuid', 'created_at')
+)
 
 
 class Command(BaseCommand):
@@ -24,10 +35,20 @@ class Command(BaseCommand):
             action='store_true',
             help='Skip roasts that already exist (by UUID)',
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Number of processes used to parse .alog files (default: CPU count)',
+        )
 
     def handle(self, *args, **options):
         directory = Path(options['directory'])
         skip_existing = options['skip_existing']
+        batch_size = int(os.environ.get('ROAST_BULK_BATCH', '500'))
+
+        if options['workers'] < 1:
+            raise CommandError('--workers must be at least 1')
 
         if not directory.exists() or not directory.is_dir():
             self.stdout.write(
@@ -35,68 +56,159 @@ class Command(BaseCommand):
             )
             return
 
-        # Find all .alog files
-        alog_files = list(directory.glob('*.alog'))
+        # Find all .alog files and candidate images in a single directory scan
+        alog_files = []
+        images = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                path = Path(entry.path)
+                if path.suffix == '.alog':
+                    alog_files.append(path)
+                elif path.suffix.lower() == '.jpg':
+                    images[path.stem] = path
+        # scandir order is arbitrary; sort so "last file wins" on duplicate UUIDs is stable
+        alog_files.sort()
         self.stdout.write(f'Found {len(alog_files)} .alog files')
 
         imported = 0
         skipped = 0
         errors = 0
 
-        for alog_path in alog_files:
-            try:
-                # Parse the .alog file
-                parsed_data = parse_alog_file(str(alog_path))
+        # Pass 1: parse every file before touching the database. Parsing is
+        # CPU-bound and each file is independent, so fan it out across processes
+        workers = min(options['workers'], len(alog_files))
+        if workers <= 1:
+            # Not worth the cost of spawning a pool
+            results = [parse_alog_file(str(p)) for p in alog_files]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(parse_alog_file, [str(p) for p in alog_files], chunksize=8))
+        parsed_results = list(zip(alog_files, results))
+
+        by_uuid = {}
+        for alog_path, parsed_data in parsed_results:
+            if not parsed_data:
+                self.stdout.write(
+                    self.style.WARNING(f'Failed to parse: {alog_path.name}')
+                )
+                errors += 1
+                continue
+
+            # Check for matching image file (same name, .jpg extension)
+            entry = (parsed_data, alog_path, images.get(alog_path.stem))
+            roast_uuid = parsed_data.get('roast_uuid')
+            if not roast_uuid:
+                # roast_uuid is unique, so these can't be told apart (or stored) reliably
+                self.stdout.write(
+                    self.style.ERROR(f'Error importing {alog_path.name}: missing roastUUID')
+                )
+                errors += 1
+            elif roast_uuid in by_uuid:
+                # Several files share a UUID; the last one wins, as it would
+                # have when each file updated the row in turn
+                superseded = by_uuid[roast_uuid][1]
+                self.stdout.write(
+                    self.style.WARNING(f'Skipping duplicate: {superseded.name} (same UUID as {alog_path.name})')
+                )
+                skipped += 1
+                by_uuid[roast_uuid] = entry
+            else:
+                by_uuid[roast_uuid] = entry
+        parsed = list(by_uuid.values())
+
+        # Pass 2: look up existing roasts in one query, then write in bulk
+        existing_map = Roast.objects.in_bulk(list(by_uuid), field_name='roast_uuid')
+
+        pending = []
+
+        for parsed_data, alog_path, image_path in parsed:
+            roast_uuid = parsed_data['roast_uuid']
 
-                if not parsed_data:
+            if roast_uuid in existing_map:
+                if skip_existing:
                     self.stdout.write(
-                        self.style.WARNING(f'Failed to parse: {alog_path.name}')
+                        self.style.WARNING(f'Skipping existing: {alog_path.name}')
                     )
-                    errors += 1
+                    skipped += 1
                     continue
+                # Update existing roast
+                roast = existing_map[roast_uuid]
+                for key, value in parsed_data.items():
+                    setattr(roast, key, value)
+                # bulk_update() skips auto_now, so bump the timestamp ourselves
+                roast.updated_at = timezone.now()
+                is_new = False
+            else:
+                # Create new roast
+                roast = Roast(**parsed_data)
+                is_new = True
+
+            # bulk_create()/bulk_update() bypass Roast.save()
+            roast.roast_level = roast.get_roast_level()
+            pending.append((roast, is_new, alog_path, image_path))
+
+        # Write in batches, committing each one in its own transaction
+        for start in range(0, len(pending), batch_size):
+            batch = []
+
+            # Store files first so each row is complete before insert
+            for roast, is_new, alog_path, image_path in pending[start:start + batch_size]:
+                row_files = []
+                try:
+                    roast.alog_file.name = self._store_file(alog_path, roast.alog_file)
+                    row_files.append(roast.alog_file.name)
+                    if image_path:
+                        roast.image_file.name = self._store_file(image_path, roast.image_file)
+                        row_files.append(roast.image_file.name)
+                    batch.append((roast, is_new, alog_path, image_path, row_files))
+                except Exception as e:
+                    # This row won't be written, so drop whatever it already stored
+                    self._delete_files(row_files)
+                    self.stdout.write(
+                        self.style.ERROR(f'Error importing {alog_path.name}: {str(e)}')
+                    )
+                    errors += 1
 
-                roast_uuid = parsed_data.get('roast_uuid')
-
-                # Check if roast already exists
-                if roast_uuid and Roast.objects.filter(roast_uuid=roast_uuid).exists():
-                    if skip_existing:
-                        self.stdout.write(
-                            self.style.WARNING(f'Skipping existing: {alog_path.name}')
-                        )
-                        skipped += 1
-                        continue
-                    else:
-                        # Update existing roast
-                        roast = Roast.objects.get(roast_uuid=roast_uuid)
-                        for key, value in parsed_data.items():
-                            setattr(roast, key, value)
-                else:
-                    # Create new roast
-                    roast = Roast(**parsed_data)
-
-                # Attach .alog file
-                with open(alog_path, 'rb') as f:
-                    roast.alog_file.save(alog_path.name, File(f), save=False)
-
-                # Check for matching image file (same name, .jpg extension)
-                image_path = alog_path.with_suffix('.jpg')
-                if image_path.exists():
-                    with open(image_path, 'rb') as f:
-                        roast.image_file.save(image_path.name, File(f), save=False)
-                    self.stdout.write(f'  - Found image: {image_path.name}')
-
-                roast.save()
+            try:
+                with transaction.atomic():
+                    self._write_rows(batch)
+                written = batch
+            except IntegrityError:
+                # One conflicting row (e.g. a roast created since the lookup above)
+                # shouldn't sink the whole batch; retry each row in its own savepoint
+                written = []
+                with transaction.atomic():
+                    for row in batch:
+                        try:
+                            with transaction.atomic():
+                                self._write_rows([row])
+                        except IntegrityError as e:
+                            self._delete_files(row[4])
+                            self.stdout.write(
+                                self.style.ERROR(f'Error importing {row[2].name}: {str(e)}')
+                            )
+                            errors += 1
+                        else:
+                            written.append(row)
+            except Exception as e:
+                # The batch was rolled back; don't leave its files behind in storage
+                for _, _, alog_path, _, row_files in batch:
+                    self._delete_files(row_files)
+                    self.stdout.write(
+                        self.style.ERROR(f'Error importing {alog_path.name}: {str(e)}')
+                    )
+                errors += len(batch)
+                continue
 
+            for roast, _, alog_path, image_path, _ in written:
+                if image_path:
+                    self.stdout.write(f'  - Found image: {image_path.name}')
                 self.stdout.write(
                     self.style.SUCCESS(f'Imported: {alog_path.name} -> {roast.title}')
                 )
-                imported += 1
-
-            except Exception as e:
-                self.stdout.write(
-                    self.style.ERROR(f'Error importing {alog_path.name}: {str(e)}')
-                )
-                errors += 1
+            imported += len(written)
 
         # Summary
         self.stdout.write('\n' + '='*60)
@@ -104,3 +216,24 @@ class Command(BaseCommand):
         self.stdout.write(f'  Imported: {imported}')
         self.stdout.write(f'  Skipped:  {skipped}')
         self.stdout.write(f'  Errors:   {errors}')
+
+    def _write_rows(self, rows):
+        """Insert new roasts and update existing ones; call inside a transaction"""
+        Roast.objects.bulk_create([roast for roast, is_new, *_ in rows if is_new])
+        Roast.objects.bulk_update(
+            [roast for roast, is_new, *_ in rows if not is_new], fields=MUTABLE_FIELDS
+        )
+
+    def _delete_files(self, names):
+        """Remove files stored for a row that was never written"""
+        for name in names:
+            default_storage.delete(name)
+
+    def _store_file(self, path, field_file):
+        """Save a file to storage under the field's upload_to and return its name"""
+        name = field_file.field.generate_filename(field_file.instance, path.name)
+        with open(path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+            content = File(f)
+            # Copy in large chunks rather than File's 64 KiB default
+            content.DEFAULT_CHUNK_SIZE = READ_BUFFER_SIZE
+            return default_storage.save(name, content)
@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+TIME_SERIES_KEYS = ('timex', 'temp1', 'temp2')
+
+
+def strip_time_series(apps, schema_editor):
+    Roast = apps.get_model('roasts', 'Roast')
+    to_update = []
+    for roast in Roast.objects.only('id', 'raw_data').iterator():
+        raw_data = roast.raw_data or {}
+        if any(key in raw_data for key in TIME_SERIES_KEYS):
+            roast.raw_data = {k: v for k, v in raw_data.items() if k not in TIME_SERIES_KEYS}
+            to_update.append(roast)
+    Roast.objects.bulk_update(to_update, ['raw_data'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roasts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(strip_time_series, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+import sys
+from array import array
+
+from django.db import migrations, models
+
+
+TIME_SERIES_FIELDS = ('timex', 'temp1', 'temp2')
+
+
+# Frozen copy of the series encoding at the time of this migration:
+# little-endian float32, None stored as Artisan's -1, decoded to 4 decimals
+def pack_series(values):
+    packed = array('f', (-1.0 if v is None else v for v in values))
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_series(blob):
+    unpacked = array('f')
+    if blob:
+        unpacked.frombytes(bytes(blob))
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return [round(v, 4) for v in unpacked]
+
+
+def pack_time_series(apps, schema_editor):
+    Roast = apps.get_model('roasts', 'Roast')
+    to_update = []
+    for roast in Roast.objects.only('id', *TIME_SERIES_FIELDS).iterator():
+        for name in TIME_SERIES_FIELDS:
+            setattr(roast, f'{name}_data', pack_series(getattr(roast, name) or []))
+        to_update.append(roast)
+    Roast.objects.bulk_update(
+        to_update, [f'{name}_data' for name in TIME_SERIES_FIELDS], batch_size=500
+    )
+
+
+def unpack_time_series(apps, schema_editor):
+    Roast = apps.get_model('roasts', 'Roast')
+    data_fields = [f'{name}_data' for name in TIME_SERIES_FIELDS]
+    to_update = []
+    for roast in Roast.objects.only('id', *data_fields).iterator():
+        for name in TIME_SERIES_FIELDS:
+            setattr(roast, name, unpack_series(getattr(roast, f'{name}_data')))
+        to_update.append(roast)
+    Roast.objects.bulk_update(to_update, list(TIME_SERIES_FIELDS), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roasts', '0002_strip_time_series_from_raw_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roast',
+            name='timex_data',
+            field=models.BinaryField(blank=True, default=bytes),
+        ),
+        migrations.AddField(
+            model_name='roast',
+            name='temp1_data',
+            field=models.BinaryField(blank=True, default=bytes),
+        ),
+        migrations.AddField(
+            model_name='roast',
+            name='temp2_data',
+            field=models.BinaryField(blank=True, default=bytes),
+        ),
+        migrations.RunPython(pack_time_series, unpack_time_series),
+        migrations.RemoveField(
+            model_name='roast',
+            name='timex',
+        ),
+        migrations.RemoveField(
+            model_name='roast',
+            name='temp1',
+        ),
+        migrations.RemoveField(
+            model_name='roast',
+            name='temp2',
+        ),
+    ]
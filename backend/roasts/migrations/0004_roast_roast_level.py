@@ -0,0 +1,36 @@
+import bisect
+
+from django.db import migrations, models
+
+
+# Frozen copy of the roast level rules at the time of this migration
+ROAST_LEVEL_THRESHOLDS = (196.0, 205.0, 213.0, 221.0)
+ROAST_LEVELS = ("Light", "Medium-Light", "Medium", "Medium-Dark", "Dark")
+
+
+def populate_roast_level(apps, schema_editor):
+    Roast = apps.get_model('roasts', 'Roast')
+    to_update = []
+    for roast in Roast.objects.only('id', 'drop_bt').iterator():
+        if roast.drop_bt is None:
+            roast.roast_level = "Unknown"
+        else:
+            roast.roast_level = ROAST_LEVELS[bisect.bisect_right(ROAST_LEVEL_THRESHOLDS, roast.drop_bt)]
+        to_update.append(roast)
+    Roast.objects.bulk_update(to_update, ['roast_level'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roasts', '0003_pack_time_series'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='roast',
+            name='roast_level',
+            field=models.CharField(blank=True, db_index=True, max_length=16),
+        ),
+        migrations.RunPython(populate_roast_level, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-15 05:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roasts', '0004_roast_roast_level'),
+    ]
+
+    operations = [
+        # roast_level_date_idx leads with roast_level, so its own index is redundant
+        migrations.AlterField(
+            model_name='roast',
+            name='roast_level',
+            field=models.CharField(blank=True, max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name='roast',
+            index=models.Index(fields=['drop_bt'], name='roast_drop_bt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roast',
+            index=models.Index(fields=['roast_level', '-roast_date'], name='roast_level_date_idx'),
+        ),
+    ]
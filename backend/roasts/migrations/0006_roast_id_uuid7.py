@@ -0,0 +1,19 @@
+# Generated by Django 5.0.1 on 2026-10-15 05:59
+
+import roasts.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roasts', '0005_roast_roast_drop_bt_idx_roast_roast_level_date_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='roast',
+            name='id',
+            field=models.UUIDField(default=roasts.models.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -1,12 +1,37 @@
 from django.db import models
+import bisect
+import os
+import time
 import uuid
 
+from .series import pack_series, unpack_series
+
+
+# Drop temperature (Celsius) upper bounds for each roast level but the last
+ROAST_LEVEL_THRESHOLDS = (196.0, 205.0, 213.0, 221.0)
+ROAST_LEVELS = ("Light", "Medium-Light", "Medium", "Medium-Dark", "Dark")
+
+
+def uuid7():
+    """
+    Generate a time-ordered UUID (RFC 9562 version 7)
+
+    The leading 48 bits are the Unix time in milliseconds, so new primary keys
+    land at the end of the index instead of on a random page.
+    """
+    timestamp_ms = time.time_ns() // 1_000_000
+    value = (timestamp_ms & ((1 << 48) - 1)) << 80 | int.from_bytes(os.urandom(10), 'big')
+    # Set version (0111) and variant (10) bits
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
+
 
 class Roast(models.Model):
     """Model representing a coffee roast with all associated data from Artisan logs"""
 
     # Primary identification
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     roast_uuid = models.CharField(max_length=255, unique=True, db_index=True)
 
     # Basic metadata
@@ -50,6 +75,9 @@ class Roast(models.Model):
     drop_bt = models.FloatField(null=True, blank=True)
     drop_et = models.FloatField(null=True, blank=True)
 
+    # Derived from drop_bt on save (see get_roast_level)
+    roast_level = models.CharField(max_length=16, blank=True)
+
     # Phase timings
     total_time = models.FloatField(null=True, blank=True)
     dry_phase_time = models.FloatField(null=True, blank=True)
@@ -92,12 +120,12 @@ class Roast(models.Model):
     alog_file = models.FileField(upload_to='alogs/', null=True, blank=True)
     image_file = models.ImageField(upload_to='roast_images/', null=True, blank=True)
 
-    # Time series data (stored as JSON)
-    timex = models.JSONField(default=list, blank=True)
-    temp1 = models.JSONField(default=list, blank=True)
-    temp2 = models.JSONField(default=list, blank=True)
+    # Time series data (packed float32, see series.py; use the timex/temp1/temp2 properties)
+    timex_data = models.BinaryField(default=bytes, blank=True)
+    temp1_data = models.BinaryField(default=bytes, blank=True)
+    temp2_data = models.BinaryField(default=bytes, blank=True)
 
-    # Raw data backup (entire parsed .alog content)
+    # Raw data backup (parsed .alog content, minus the time series above)
     raw_data = models.JSONField(default=dict, blank=True)
 
     # Timestamps
@@ -110,24 +138,46 @@ class Roast(models.Model):
             models.Index(fields=['-roast_date', '-roast_time']),
             models.Index(fields=['title']),
             models.Index(fields=['beans']),
+            models.Index(fields=['drop_bt'], name='roast_drop_bt_idx'),
+            models.Index(fields=['roast_level', '-roast_date'], name='roast_level_date_idx'),
         ]
 
     def __str__(self):
         return f"{self.title} - {self.roast_date}"
 
+    def save(self, *args, **kwargs):
+        self.roast_level = self.get_roast_level()
+        super().save(*args, **kwargs)
+
+    @property
+    def timex(self):
+        """Sample times in seconds"""
+        return unpack_series(self.timex_data)
+
+    @timex.setter
+    def timex(self, values):
+        self.timex_data = pack_series(values)
+
+    @property
+    def temp1(self):
+        """Environment temperature samples"""
+        return unpack_series(self.temp1_data)
+
+    @temp1.setter
+    def temp1(self, values):
+        self.temp1_data = pack_series(values)
+
+    @property
+    def temp2(self):
+        """Bean temperature samples"""
+        return unpack_series(self.temp2_data)
+
+    @temp2.setter
+    def temp2(self, values):
+        self.temp2_data = pack_series(values)
+
     def get_roast_level(self):
         """Determine roast level based on drop temperature"""
         if self.drop_bt is None:
             return "Unknown"
-
-        # Temperature ranges in Celsius
-        if self.drop_bt < 196:
-            return "Light"
-        elif self.drop_bt < 205:
-            return "Medium-Light"
-        elif self.drop_bt < 213:
-            return "Medium"
-        elif self.drop_bt < 221:
-            return "Medium-Dark"
-        else:
-            return "Dark"
+        return ROAST_LEVELS[bisect.bisect_right(ROAST_LEVEL_THRESHOLDS, self.drop_bt)]
@@ -3,8 +3,151 @@ Parser for Artisan .alog files
 """
 import ast
 import json
+import re
 from datetime import datetime, time, date
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Union
+
+import orjson
+
+from .series import pack_series
+
+
+# Keys already stored in their own Roast columns, left out of raw_data
+# so the (large) time series are not saved twice
+RAW_DATA_EXCLUDED_KEYS = ('timex', 'temp1', 'temp2')
+
+# Read whole .alog files through a large buffer (they run to several MB)
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Python literal tokens that differ from JSON: quoted strings and True/False/None.
+# Matched on raw bytes so file contents never need decoding on the fast path
+_PY_LITERAL_TOKEN = re.compile(
+    rb"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\b(?:True|False|None)\b", re.DOTALL
+)
+# Escapes inside a single-quoted string, plus bare double quotes that need escaping
+_SINGLE_QUOTED_ESCAPE = re.compile(rb'\\(.)|"', re.DOTALL)
+_JSON_KEYWORDS = {b'True': b'true', b'False': b'false', b'None': b'null'}
+
+
+def _single_quoted_escape(match: re.Match) -> bytes:
+    if match.group(0) == b'"':
+        return b'\\"'
+    if match.group(1) == b"'":
+        return b"'"
+    return match.group(0)
+
+
+def _py_literal_token_to_json(match: re.Match) -> bytes:
+    token = match.group(0)
+    if token[:1] == b"'":
+        return b'"' + _SINGLE_QUOTED_ESCAPE.sub(_single_quoted_escape, token[1:-1]) + b'"'
+    if token[:1] == b'"':
+        return token
+    return _JSON_KEYWORDS[token]
+
+
+def load_alog_data(content: Union[str, bytes]) -> Dict[str, Any]:
+    """
+    Load the Python dictionary literal stored in an .alog file
+
+    Artisan writes plain dict/list/str/number literals, which are translated to
+    JSON and parsed with orjson. Anything the translation can't represent
+    (tuples, non-JSON escapes, nan, ...) falls back to ast.literal_eval.
+
+    Args:
+        content: Content of .alog file, as UTF-8 bytes or a string
+
+    Returns:
+        Raw dictionary from .alog file
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    try:
+        return orjson.loads(_PY_LITERAL_TOKEN.sub(_py_literal_token_to_json, content))
+    except orjson.JSONDecodeError:
+        return ast.literal_eval(content.decode('utf-8'))
+
+
+# Direct field mappings: (model field, source dict, source key, default).
+# Source is either the top-level .alog dict ('data') or data['computed'].
+# Fields that need conversion are handled in extract_roast_data.
+_ROAST_FIELDS = (
+    # Identification
+    ('roast_uuid', 'data', 'roastUUID', ''),
+    ('title', 'data', 'title', 'Untitled Roast'),
+    ('roast_epoch', 'data', 'roastepoch', 0),
+
+    # People and equipment
+    ('operator', 'data', 'operator', ''),
+    ('organization', 'data', 'organization', ''),
+    ('roaster_type', 'data', 'roastertype', ''),
+    ('roaster_size', 'data', 'roastersize', None),
+    ('roaster_heating', 'data', 'roasterheating', None),
+
+    # Bean information
+    ('beans', 'data', 'beans', ''),
+    ('weight_out', 'computed', 'weightout', None),
+    ('weight_loss', 'computed', 'weight_loss', None),
+
+    # Key temperature points from computed data
+    ('charge_bt', 'computed', 'CHARGE_BT', None),
+    ('charge_et', 'computed', 'CHARGE_ET', None),
+
+    ('tp_time', 'computed', 'TP_time', None),
+    ('tp_bt', 'computed', 'TP_BT', None),
+    ('tp_et', 'computed', 'TP_ET', None),
+
+    ('dry_time', 'computed', 'DRY_time', None),
+    ('dry_bt', 'computed', 'DRY_BT', None),
+    ('dry_et', 'computed', 'DRY_ET', None),
+
+    ('fcs_time', 'computed', 'FCs_time', None),
+    ('fcs_bt', 'computed', 'FCs_BT', None),
+    ('fcs_et', 'computed', 'FCs_ET', None),
+    ('fcs_ror', 'computed', 'fcs_ror', None),
+
+    ('drop_time', 'computed', 'DROP_time', None),
+    ('drop_bt', 'computed', 'DROP_BT', None),
+    ('drop_et', 'computed', 'DROP_ET', None),
+
+    # Phase timings
+    ('total_time', 'computed', 'totaltime', None),
+    ('dry_phase_time', 'computed', 'dryphasetime', None),
+    ('mid_phase_time', 'computed', 'midphasetime', None),
+    ('finish_phase_time', 'computed', 'finishphasetime', None),
+
+    # ROR metrics
+    ('dry_phase_ror', 'computed', 'dry_phase_ror', None),
+    ('mid_phase_ror', 'computed', 'mid_phase_ror', None),
+    ('finish_phase_ror', 'computed', 'finish_phase_ror', None),
+    ('total_ror', 'computed', 'total_ror', None),
+
+    # Temperature deltas
+    ('dry_phase_delta_temp', 'computed', 'dry_phase_delta_temp', None),
+    ('mid_phase_delta_temp', 'computed', 'mid_phase_delta_temp', None),
+    ('finish_phase_delta_temp', 'computed', 'finish_phase_delta_temp', None),
+
+    # Color measurements
+    ('whole_color', 'data', 'whole_color', None),
+    ('ground_color', 'data', 'ground_color', None),
+    ('color_system', 'data', 'color_system', ''),
+
+    # Defects
+    ('heavy_fc', 'data', 'heavyFC', False),
+    ('low_fc', 'data', 'lowFC', False),
+    ('light_cut', 'data', 'lightCut', False),
+    ('dark_cut', 'data', 'darkCut', False),
+    ('drops', 'data', 'drops', False),
+    ('oily', 'data', 'oily', False),
+    ('uneven', 'data', 'uneven', False),
+    ('tipping', 'data', 'tipping', False),
+    ('scorching', 'data', 'scorching', False),
+    ('divots', 'data', 'divots', False),
+
+    # Notes
+    ('roasting_notes', 'data', 'roastingnotes', ''),
+    ('cupping_notes', 'data', 'cuppingnotes', ''),
+)
 
 
 def parse_alog_file(file_path: str) -> Optional[Dict[str, Any]]:
@@ -18,12 +161,11 @@ def parse_alog_file(file_path: str) -> Optional[Dict[str, Any]]:
         Dictionary containing parsed roast data, or None if parsing fails
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(file_path, 'rb', buffering=READ_BUFFER_SIZE) as f:
             content = f.read()
 
         # .alog files contain a Python dictionary literal
-        # We can use ast.literal_eval to safely parse it
-        data = ast.literal_eval(content)
+        data = load_alog_data(content)
 
         return extract_roast_data(data)
     except Exception as e:
@@ -31,6 +173,84 @@ def parse_alog_file(file_path: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+def _phase_ror(start_bt: float, end_bt: float, start_time: float, end_time: float) -> Optional[float]:
+    """Rate of rise in degrees per minute between two points"""
+    if end_time <= start_time:
+        return None
+    return round((end_bt - start_bt) / (end_time - start_time) * 60, 1)
+
+
+def _compute_phase_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Derive Artisan's computed phase metrics from the raw curve
+
+    Uses the event indices in timeindex ([CHARGE, DRY, FCs, FCe, SCs, SCe, DROP, COOL])
+    to read BT/ET at each event, so only the turning point search touches every sample.
+    Times are relative to CHARGE, matching Artisan.
+
+    Args:
+        data: Raw dictionary from .alog file
+
+    Returns:
+        Dictionary using the same keys as data['computed'] (missing events are left out)
+    """
+    timex = data.get('timex', [])
+    et = data.get('temp1', [])
+    bt = data.get('temp2', [])
+    timeindex = list(data.get('timeindex', [])) + [0] * 8
+
+    n = min(len(timex), len(et), len(bt))
+    charge_idx = timeindex[0]
+    if n == 0 or not 0 <= charge_idx < n:
+        return {}
+
+    charge_time = timex[charge_idx]
+    events = {'CHARGE': charge_idx}
+    for name, idx in (('DRY', timeindex[1]), ('FCs', timeindex[2]), ('DROP', timeindex[6])):
+        # Artisan uses 0 for events that were never marked
+        if 0 < idx < n:
+            events[name] = idx
+
+    # Turning point: lowest BT between CHARGE and the next marked event. Like
+    # Artisan, take the last sample of a flat minimum
+    tp_end = min([idx for name, idx in events.items() if name != 'CHARGE'] or [n])
+    tp_range = [i for i in range(charge_idx, tp_end) if bt[i] != -1]
+    if tp_range:
+        events['TP'] = max(tp_range, key=lambda i: (-bt[i], i))
+
+    metrics = {}
+    points = {}
+    for name, idx in events.items():
+        points[name] = (round(timex[idx] - charge_time, 1), bt[idx])
+        metrics[f'{name}_BT'] = round(bt[idx], 1)
+        metrics[f'{name}_ET'] = round(et[idx], 1)
+        if name != 'CHARGE':
+            metrics[f'{name}_time'] = points[name][0]
+
+    phases = (
+        ('dry', 'dryphasetime', 'TP', 'DRY', 'CHARGE'),
+        ('mid', 'midphasetime', 'DRY', 'FCs', 'DRY'),
+        ('finish', 'finishphasetime', 'FCs', 'DROP', 'FCs'),
+    )
+    for prefix, time_key, ror_start, end, time_start in phases:
+        if end not in points:
+            continue
+        if time_start in points:
+            metrics[time_key] = round(points[end][0] - points[time_start][0], 1)
+        if ror_start in points:
+            (t0, bt0), (t1, bt1) = points[ror_start], points[end]
+            metrics[f'{prefix}_phase_ror'] = _phase_ror(bt0, bt1, t0, t1)
+            metrics[f'{prefix}_phase_delta_temp'] = round(bt1 - bt0, 1)
+
+    if 'DROP' in points:
+        metrics['totaltime'] = points['DROP'][0]
+        if 'TP' in points:
+            (t0, bt0), (t1, bt1) = points['TP'], points['DROP']
+            metrics['total_ror'] = _phase_ror(bt0, bt1, t0, t1)
+
+    return metrics
+
+
 def extract_roast_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Extract and structure roast data from parsed .alog content
@@ -44,6 +264,14 @@ def extract_roast_data(data: Dict[str, Any]) -> Dict[str, Any]:
     # Get computed values (contains most of the key metrics)
     computed = data.get('computed', {})
 
+    # Older Artisan versions don't write the phase metrics; derive them from the curve
+    if computed.get('dry_phase_ror') is None:
+        # Values Artisan did write win, but an explicit None must not mask a derived one
+        computed = {
+            **_compute_phase_metrics(data),
+            **{k: v for k, v in computed.items() if v is not None},
+        }
+
     # Parse date and time
     roast_iso_date = data.get('roastisodate', '')
     roast_time_str = data.get('roasttime', '00:00:00')
@@ -64,113 +292,43 @@ def extract_roast_data(data: Dict[str, Any]) -> Dict[str, Any]:
     weight_unit = weight_data[2] if len(weight_data) > 2 else 'g'
 
     # Build structured data
+    sources = {'data': data, 'computed': computed}
     roast_data = {
-        # Identification
-        'roast_uuid': data.get('roastUUID', ''),
-        'title': data.get('title', 'Untitled Roast'),
-
-        # Date and time
-        'roast_date': roast_date_obj,
-        'roast_time': roast_time_obj,
-        'roast_epoch': data.get('roastepoch', 0),
-
-        # People and equipment
-        'operator': data.get('operator', ''),
-        'organization': data.get('organization', ''),
-        'roaster_type': data.get('roastertype', ''),
-        'roaster_size': data.get('roastersize', None),
-        'roaster_heating': data.get('roasterheating', None),
-
-        # Bean information
-        'beans': data.get('beans', ''),
-        'weight_in': weight_in,
-        'weight_out': computed.get('weightout', None),
-        'weight_unit': weight_unit,
-        'weight_loss': computed.get('weight_loss', None),
-
-        # Key temperature points from computed data
-        'charge_bt': computed.get('CHARGE_BT', None),
-        'charge_et': computed.get('CHARGE_ET', None),
-
-        'tp_time': computed.get('TP_time', None),
-        'tp_bt': computed.get('TP_BT', None),
-        'tp_et': computed.get('TP_ET', None),
-
-        'dry_time': computed.get('DRY_time', None),
-        'dry_bt': computed.get('DRY_BT', None),
-        'dry_et': computed.get('DRY_ET', None),
-
-        'fcs_time': computed.get('FCs_time', None),
-        'fcs_bt': computed.get('FCs_BT', None),
-        'fcs_et': computed.get('FCs_ET', None),
-        'fcs_ror': computed.get('fcs_ror', None),
-
-        'drop_time': computed.get('DROP_time', None),
-        'drop_bt': computed.get('DROP_BT', None),
-        'drop_et': computed.get('DROP_ET', None),
-
-        # Phase timings
-        'total_time': computed.get('totaltime', None),
-        'dry_phase_time': computed.get('dryphasetime', None),
-        'mid_phase_time': computed.get('midphasetime', None),
-        'finish_phase_time': computed.get('finishphasetime', None),
-
-        # ROR metrics
-        'dry_phase_ror': computed.get('dry_phase_ror', None),
-        'mid_phase_ror': computed.get('mid_phase_ror', None),
-        'finish_phase_ror': computed.get('finish_phase_ror', None),
-        'total_ror': computed.get('total_ror', None),
-
-        # Temperature deltas
-        'dry_phase_delta_temp': computed.get('dry_phase_delta_temp', None),
-        'mid_phase_delta_temp': computed.get('mid_phase_delta_temp', None),
-        'finish_phase_delta_temp': computed.get('finish_phase_delta_temp', None),
-
-        # Color measurements
-        'whole_color': data.get('whole_color', None),
-        'ground_color': data.get('ground_color', None),
-        'color_system': data.get('color_system', ''),
-
-        # Defects
-        'heavy_fc': data.get('heavyFC', False),
-        'low_fc': data.get('lowFC', False),
-        'light_cut': data.get('lightCut', False),
-        'dark_cut': data.get('darkCut', False),
-        'drops': data.get('drops', False),
-        'oily': data.get('oily', False),
-        'uneven': data.get('uneven', False),
-        'tipping': data.get('tipping', False),
-        'scorching': data.get('scorching', False),
-        'divots': data.get('divots', False),
-
-        # Notes
-        'roasting_notes': data.get('roastingnotes', ''),
-        'cupping_notes': data.get('cuppingnotes', ''),
-
-        # Time series data
-        'timex': data.get('timex', []),
-        'temp1': data.get('temp1', []),
-        'temp2': data.get('temp2', []),
-
-        # Store entire raw data
-        'raw_data': data,
+        field: sources[source].get(key, default)
+        for field, source, key, default in _ROAST_FIELDS
     }
 
+    # Date and time
+    roast_data['roast_date'] = roast_date_obj
+    roast_data['roast_time'] = roast_time_obj
+
+    # Bean weight
+    roast_data['weight_in'] = weight_in
+    roast_data['weight_unit'] = weight_unit
+
+    # Time series data (packed float32)
+    roast_data['timex_data'] = pack_series(data.get('timex', []))
+    roast_data['temp1_data'] = pack_series(data.get('temp1', []))
+    roast_data['temp2_data'] = pack_series(data.get('temp2', []))
+
+    # Store remaining raw data (time series live in their own columns)
+    roast_data['raw_data'] = {k: v for k, v in data.items() if k not in RAW_DATA_EXCLUDED_KEYS}
+
     return roast_data
 
 
-def parse_alog_content(content: str) -> Optional[Dict[str, Any]]:
+def parse_alog_content(content: Union[str, bytes]) -> Optional[Dict[str, Any]]:
     """
-    Parse .alog file content string
+    Parse .alog file content
 
     Args:
-        content: String content of .alog file
+        content: Content of .alog file, as UTF-8 bytes or a string
 
     Returns:
         Dictionary containing parsed roast data, or None if parsing fails
     """
     try:
-        data = ast.literal_eval(content)
+        data = load_alog_data(content)
         return extract_roast_data(data)
     except Exception as e:
         print(f"Error parsing .alog content: {e}")
@@ -5,33 +5,48 @@ from rest_framework import serializers
 from .models import Roast
 
 
-class RoastListSerializer(serializers.ModelSerializer):
-    """Simplified serializer for list view"""
-    roast_level = serializers.SerializerMethodField()
+class RoastListSerializer(serializers.Serializer):
+    """
+    Simplified read-only serializer for list view
 
-    class Meta:
-        model = Roast
-        fields = [
-            'id', 'roast_uuid', 'title', 'roast_date', 'roast_time',
-            'beans', 'weight_in', 'operator', 'drop_bt', 'total_time',
-            'roast_level', 'image_file', 'created_at'
-        ]
+    Reads plain dicts from Roast.objects.values() rather than model instances,
+    so it only declares the columns the list view selects.
+    """
+    id = serializers.UUIDField(read_only=True)
+    roast_uuid = serializers.CharField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    roast_date = serializers.DateField(read_only=True)
+    roast_time = serializers.TimeField(read_only=True)
+    beans = serializers.CharField(read_only=True)
+    weight_in = serializers.FloatField(read_only=True)
+    operator = serializers.CharField(read_only=True)
+    drop_bt = serializers.FloatField(read_only=True)
+    total_time = serializers.FloatField(read_only=True)
+    roast_level = serializers.CharField(read_only=True)
+    image_file = serializers.SerializerMethodField()
+    created_at = serializers.DateTimeField(read_only=True)
 
-    def get_roast_level(self, obj):
-        return obj.get_roast_level()
+    def get_image_file(self, obj):
+        """Build the image URL the same way ImageField does for model instances"""
+        name = obj['image_file']
+        if not name:
+            return None
+        url = Roast._meta.get_field('image_file').storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
 
 
 class RoastDetailSerializer(serializers.ModelSerializer):
     """Complete serializer with all fields"""
-    roast_level = serializers.SerializerMethodField()
+    timex = serializers.ListField(child=serializers.FloatField(), required=False)
+    temp1 = serializers.ListField(child=serializers.FloatField(), required=False)
+    temp2 = serializers.ListField(child=serializers.FloatField(), required=False)
 
     class Meta:
         model = Roast
-        fields = '__all__'
-        read_only_fields = ['id', 'created_at', 'updated_at']
-
-    def get_roast_level(self, obj):
-        return obj.get_roast_level()
+        # Packed time series are exposed as plain lists via the fields above
+        exclude = ['timex_data', 'temp1_data', 'temp2_data']
+        read_only_fields = ['id', 'roast_level', 'created_at', 'updated_at']
 
 
 class RoastUploadSerializer(serializers.Serializer):
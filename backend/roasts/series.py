@@ -0,0 +1,35 @@
+"""
+Compact binary encoding for roast time series (timex, temp1, temp2)
+"""
+import sys
+from array import array
+from typing import Iterable, List, Optional
+
+
+# Samples are stored as packed little-endian float32 values (4 bytes each)
+SERIES_TYPECODE = 'f'
+
+# float32 keeps ~7 significant digits; rounding on decode hides the noise
+# (e.g. 179.55 -> 179.5500030517578) so API payloads stay readable
+SERIES_DECIMALS = 4
+
+# Artisan marks missing samples with -1
+MISSING_SAMPLE = -1.0
+
+
+def pack_series(values: Iterable[Optional[float]]) -> bytes:
+    """Pack a sequence of floats into float32 bytes"""
+    packed = array(SERIES_TYPECODE, (MISSING_SAMPLE if v is None else v for v in values))
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_series(blob) -> List[float]:
+    """Unpack float32 bytes (bytes or memoryview) back into a list of floats"""
+    unpacked = array(SERIES_TYPECODE)
+    if blob:
+        unpacked.frombytes(bytes(blob))
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return [round(v, SERIES_DECIMALS) for v in unpacked]
@@ -0,0 +1,127 @@
+"""
+Background work for the Roast API
+"""
+import logging
+import shutil
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connection
+from django.utils import timezone
+
+from .models import Roast
+
+logger = logging.getLogger(__name__)
+
+
+def stage_alog_file(roast_id, filename: str, content: bytes) -> Path:
+    """
+    Write uploaded .alog bytes to the staging directory
+
+    Each roast gets its own directory, and creating it claims the roast's
+    file: a second upload can't replace a file that is still being stored.
+
+    Args:
+        roast_id: Primary key of the Roast the file belongs to
+        filename: Original upload filename
+        content: Raw .alog bytes
+
+    Returns:
+        Path of the staged file
+
+    Raises:
+        FileExistsError: A file is already staged for this roast
+    """
+    staging_root = Path(settings.ALOG_STAGING_DIR)
+    staging_root.mkdir(parents=True, exist_ok=True)
+    staging_dir = staging_root / str(roast_id)
+    staging_dir.mkdir()
+    staged_path = staging_dir / Path(filename).name
+    try:
+        staged_path.write_bytes(content)
+    except Exception:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+    return staged_path
+
+
+def discard_staged_alog_file(staged_path: Path) -> None:
+    """Remove a staged file and its roast's staging directory"""
+    shutil.rmtree(Path(staged_path).parent, ignore_errors=True)
+
+
+def finalize_alog_file(roast_id, staged_path: Path) -> bool:
+    """
+    Move a staged .alog file into storage and attach it to its roast
+
+    On failure the staged file is left in place so finalize_staged_alog_files()
+    can retry it later.
+
+    Args:
+        roast_id: Primary key of the (already committed) Roast
+        staged_path: Path returned by stage_alog_file
+
+    Returns:
+        True if the file was stored (or is no longer needed)
+    """
+    staged_path = Path(staged_path)
+    try:
+        field = Roast._meta.get_field('alog_file')
+        with open(staged_path, 'rb') as f:
+            name = field.storage.save(field.generate_filename(None, staged_path.name), File(f))
+        # update() skips auto_now, so bump updated_at to invalidate cached responses
+        attached = Roast.objects.filter(pk=roast_id, alog_file='').update(
+            alog_file=name, updated_at=timezone.now()
+        )
+        if not attached:
+            # The roast was deleted in the meantime, or already has a file
+            field.storage.delete(name)
+    except Exception:
+        logger.exception('Failed to store .alog file %s for roast %s', staged_path, roast_id)
+        return False
+
+    discard_staged_alog_file(staged_path)
+    return True
+
+
+def _finalize_in_thread(roast_id, staged_path: Path) -> None:
+    try:
+        finalize_alog_file(roast_id, staged_path)
+    finally:
+        # Threads get their own DB connection; don't leave it open
+        connection.close()
+
+
+def finalize_alog_file_async(roast_id, staged_path: Path) -> None:
+    """Run finalize_alog_file in a background thread so the request can return"""
+    threading.Thread(
+        target=_finalize_in_thread,
+        args=(roast_id, staged_path),
+        name=f'finalize-alog-{roast_id}',
+    ).start()
+
+
+def finalize_staged_alog_files():
+    """
+    Retry every file still in the staging directory
+
+    Picks up uploads whose background task failed or never ran (e.g. the
+    worker was restarted).
+
+    Returns:
+        Tuple of (finalized, failed) counts
+    """
+    staging_root = Path(settings.ALOG_STAGING_DIR)
+    if not staging_root.is_dir():
+        return 0, 0
+
+    finalized = failed = 0
+    for roast_dir in staging_root.iterdir():
+        for staged_path in list(roast_dir.iterdir()) if roast_dir.is_dir() else ():
+            if finalize_alog_file(roast_dir.name, staged_path):
+                finalized += 1
+            else:
+                failed += 1
+    return finalized, failed
@@ -1,3 +1,620 @@
-from django.test import TestCase
+import ast
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .management.commands.import_roasts import Command as ImportRoastsCommand
+from .models import Roast, uuid7
+from .parsers import _compute_phase_metrics, extract_roast_data, load_alog_data
+from .series import pack_series, unpack_series
+from .tasks import finalize_alog_file, finalize_staged_alog_files, stage_alog_file
+from .views import LIST_FIELDS
+
+SAMPLE_ROASTS_DIR = Path(__file__).resolve().parents[2] / 'Roasts'
+
+
+class LoadAlogDataTests(TestCase):
+    """load_alog_data must agree with ast.literal_eval on Artisan's repr() output"""
+
+    def assertMatchesLiteralEval(self, value):
+        content = repr(value)
+        expected = ast.literal_eval(content)
+        self.assertEqual(load_alog_data(content), expected)
+        self.assertEqual(load_alog_data(content.encode('utf-8')), expected)
+
+    def test_plain_literals(self):
+        self.assertMatchesLiteralEval({
+            'title': 'HuHu200',
+            'flags': [True, False, None],
+            'numbers': [0, -1, 2.5, -1.5e-7, 1762014784],
+            'nested': {'computed': {'TP_BT': 92.0}, 'empty': [], 'blank': ''},
+        })
+
+    def test_quotes_and_escapes(self):
+        self.assertMatchesLiteralEval({
+            'single': "it's",
+            'double': 'say "hi"',
+            'both': 'both \' and "',
+            'backslash': 'back\\slash',
+            'escaped_quote': "\\'",
+            'escaped_double': 'a\\"b',
+            'whitespace': 'line\nbreak\ttab',
+            'control': '\x00\x07',
+            'unicode': 'é ü ☃',
+            'keywords_in_strings': ['True', 'None', "False'"],
+        })
+
+    def test_json_path_skips_literal_eval(self):
+        with mock.patch('roasts.parsers.ast.literal_eval', wraps=ast.literal_eval) as literal_eval:
+            load_alog_data(repr({'a': [1, 'b', True]}))
+        literal_eval.assert_not_called()
+
+    def test_falls_back_to_literal_eval(self):
+        for value in ({'pair': (1, 2)}, {1: 'int key'}):
+            with self.subTest(value=value):
+                with mock.patch('roasts.parsers.ast.literal_eval', wraps=ast.literal_eval) as literal_eval:
+                    self.assertEqual(load_alog_data(repr(value)), value)
+                literal_eval.assert_called_once()
+
+    def test_nan_is_rejected_like_literal_eval(self):
+        content = repr({'x': float('nan')})
+        with self.assertRaises(ValueError):
+            ast.literal_eval(content)
+        with self.assertRaises(ValueError):
+            load_alog_data(content)
+
+
+class ComputePhaseMetricsTests(TestCase):
+    """Derived phase metrics should reproduce Artisan's own computed values"""
+
+    def sample_alog_paths(self):
+        alog_paths = sorted(SAMPLE_ROASTS_DIR.glob('*.alog'))
+        if not alog_paths:
+            self.skipTest('Sample roasts not available')
+        return alog_paths
+
+    def test_matches_artisan_computed(self):
+        for alog_path in self.sample_alog_paths():
+            data = load_alog_data(alog_path.read_bytes())
+            computed = data['computed']
+            metrics = _compute_phase_metrics(data)
+            self.assertIn('dry_phase_ror', metrics)
+            for key, value in metrics.items():
+                with self.subTest(file=alog_path.name, key=key):
+                    self.assertAlmostEqual(value, computed[key], delta=0.05)
+
+    def test_no_samples(self):
+        self.assertEqual(_compute_phase_metrics({}), {})
+
+    def test_none_in_computed_does_not_mask_derived(self):
+        data = load_alog_data(self.sample_alog_paths()[0].read_bytes())
+        expected = _compute_phase_metrics(data)
+        data['computed'] = {**data['computed'], 'dry_phase_ror': None, 'total_ror': None}
+
+        roast_data = extract_roast_data(data)
+        self.assertEqual(roast_data['dry_phase_ror'], expected['dry_phase_ror'])
+        self.assertEqual(roast_data['total_ror'], expected['total_ror'])
+        # Values Artisan did write are kept as-is
+        self.assertEqual(roast_data['drop_bt'], data['computed']['DROP_BT'])
+
+
+class Uuid7Tests(TestCase):
+
+    def test_version_and_variant(self):
+        value = uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+
+    def test_timestamp_prefix(self):
+        with mock.patch('roasts.models.time.time_ns', return_value=1_762_014_784_123_000_000):
+            value = uuid7()
+        self.assertEqual(value.int >> 80, 1_762_014_784_123)
+
+    def test_ordered_by_time(self):
+        timestamps = [1_762_014_784_000_000_000 + i * 1_000_000 for i in range(50)]
+        with mock.patch('roasts.models.time.time_ns', side_effect=timestamps):
+            values = [uuid7() for _ in timestamps]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual([str(v) for v in values], sorted(str(v) for v in values))
+
+    def test_default_primary_key(self):
+        roast = Roast(roast_uuid='65df2371f42846ec99f08c916975f8b4', title='HuHu200')
+        self.assertEqual(roast.pk.version, 7)
+
+
+class RoastAPITestCase(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('roaster'))
+        self.roast = Roast.objects.create(
+            roast_uuid='65df2371f42846ec99f08c916975f8b4',
+            title='HuHu200',
+            roast_date=date(2025, 11, 1),
+            roast_time=time(12, 12, 27),
+            roast_epoch=1762014784,
+            drop_bt=200.1,
+        )
+
+
+class ConditionalGetTests(RoastAPITestCase):
+
+    def assertNotModifiedUntilChanged(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+        self.roast.cupping_notes = 'Sweet'
+        self.roast.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_list(self):
+        self.assertNotModifiedUntilChanged('/api/roasts/')
+
+    def test_detail(self):
+        self.assertNotModifiedUntilChanged(f'/api/roasts/{self.roast.pk}/')
+
+    def test_list_etag_changes_on_delete(self):
+        Roast.objects.create(
+            roast_uuid='ee6f72050d254901ace4caef9472c496',
+            title='HuHu400Med',
+            roast_date=date(2025, 11, 1),
+            roast_time=time(11, 10, 40),
+            roast_epoch=1762009840,
+        )
+        etag = self.client.get('/api/roasts/')['ETag']
+        Roast.objects.filter(title='HuHu400Med').delete()
+        response = self.client.get('/api/roasts/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+
+
+class RoastListTests(RoastAPITestCase):
+
+    def test_serializes_values_rows(self):
+        results = self.client.get('/api/roasts/').json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(set(results[0]), set(LIST_FIELDS))
+        self.assertEqual(results[0]['id'], str(self.roast.pk))
+        self.assertEqual(results[0]['roast_date'], '2025-11-01')
+        self.assertEqual(results[0]['drop_bt'], 200.1)
+        self.assertIsNone(results[0]['image_file'])
+
+    def test_image_file_url(self):
+        Roast.objects.filter(pk=self.roast.pk).update(image_file='roast_images/HuHu200.jpg')
+        result = self.client.get('/api/roasts/').json()['results'][0]
+        self.assertEqual(result['image_file'], 'http://testserver/media/roast_images/HuHu200.jpg')
+
+
+class SeriesTests(TestCase):
+
+    def test_round_trip(self):
+        values = [0.0, 1.5, 179.55, 204.3, 1762014784.0]
+        self.assertEqual(unpack_series(pack_series(values))[:4], [0.0, 1.5, 179.55, 204.3])
+
+    def test_little_endian_float32(self):
+        self.assertEqual(pack_series([1.0]), b'\x00\x00\x80\x3f')
+
+    def test_none_stored_as_missing_sample(self):
+        self.assertEqual(unpack_series(pack_series([None, 2.0])), [-1.0, 2.0])
+
+    def test_empty_and_memoryview(self):
+        self.assertEqual(pack_series([]), b'')
+        self.assertEqual(unpack_series(b''), [])
+        self.assertEqual(unpack_series(None), [])
+        self.assertEqual(unpack_series(memoryview(pack_series([3.25]))), [3.25])
+
+    def test_model_properties(self):
+        roast = Roast(timex_data=pack_series([0.0, 2.0]), temp1_data=pack_series([150.25, 149.5]))
+        self.assertEqual(roast.timex, [0.0, 2.0])
+        self.assertEqual(roast.temp1, [150.25, 149.5])
+        self.assertEqual(roast.temp2, [])
+
+
+class PackTimeSeriesMigrationTests(TransactionTestCase):
+    """0003 packs the JSON time series into blobs and can unpack them again"""
+
+    before = [('roasts', '0002_strip_time_series_from_raw_data')]
+    after = [('roasts', '0003_pack_time_series')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_forwards_and_backwards(self):
+        apps = self.migrate(self.before)
+        OldRoast = apps.get_model('roasts', 'Roast')
+        OldRoast.objects.create(
+            roast_uuid='65df2371f42846ec99f08c916975f8b4',
+            title='HuHu200',
+            roast_date=date(2025, 11, 1),
+            roast_time=time(12, 12, 27),
+            roast_epoch=1762014784,
+            timex=[0.0, 2.0, 4.0],
+            temp1=[150.25, 149.5, -1.0],
+            temp2=[],
+        )
+
+        apps = self.migrate(self.after)
+        roast = apps.get_model('roasts', 'Roast').objects.get()
+        self.assertEqual(bytes(roast.timex_data), pack_series([0.0, 2.0, 4.0]))
+        self.assertEqual(unpack_series(roast.temp1_data), [150.25, 149.5, -1.0])
+        self.assertEqual(bytes(roast.temp2_data), b'')
+
+        apps = self.migrate(self.before)
+        roast = apps.get_model('roasts', 'Roast').objects.get()
+        self.assertEqual(roast.timex, [0.0, 2.0, 4.0])
+        self.assertEqual(roast.temp1, [150.25, 149.5, -1.0])
+        self.assertEqual(roast.temp2, [])
+
+
+class RoastLevelFilterTests(RoastAPITestCase):
+    """roast_level is stored on save and filtered with an exact match"""
+
+    def test_stored_on_save(self):
+        self.assertEqual(Roast.objects.values_list('roast_level', flat=True).get(), 'Medium-Light')
+
+        self.roast.drop_bt = 215.0
+        self.roast.save()
+        self.assertEqual(Roast.objects.values_list('roast_level', flat=True).get(), 'Medium-Dark')
+
+        self.roast.drop_bt = None
+        self.roast.save()
+        self.assertEqual(Roast.objects.values_list('roast_level', flat=True).get(), 'Unknown')
+
+    def test_filter(self):
+        Roast.objects.create(
+            roast_uuid='ee6f72050d254901ace4caef9472c496',
+            title='HuHu400MedDark205',
+            roast_date=date(2025, 11, 1),
+            roast_time=time(11, 10, 40),
+            roast_epoch=1762009840,
+            drop_bt=214.0,
+        )
+        for value, titles in (
+            ('medium-light', ['HuHu200']),
+            ('Medium-Dark', ['HuHu400MedDark205']),
+            ('dark', []),
+            # Unknown levels are ignored rather than matching nothing
+            ('bogus', ['HuHu200', 'HuHu400MedDark205']),
+        ):
+            with self.subTest(roast_level=value):
+                results = self.client.get('/api/roasts/', {'roast_level': value}).json()['results']
+                self.assertCountEqual([r['title'] for r in results], titles)
+
+
+class RoastLevelTests(TestCase):
+
+    def test_boundaries(self):
+        # Each threshold is the first temperature of the next level, as in the old if/elif ladder
+        for drop_bt, level in (
+            (None, 'Unknown'),
+            (150.0, 'Light'),
+            (195.9, 'Light'),
+            (196.0, 'Medium-Light'),
+            (204.99, 'Medium-Light'),
+            (205.0, 'Medium'),
+            (213.0, 'Medium-Dark'),
+            (220.9, 'Medium-Dark'),
+            (221.0, 'Dark'),
+            (240.0, 'Dark'),
+        ):
+            with self.subTest(drop_bt=drop_bt):
+                self.assertEqual(Roast(drop_bt=drop_bt).get_roast_level(), level)
+
+
+class ImportRoastsTests(TestCase):
+
+    def setUp(self):
+        self.sample_paths = sorted(SAMPLE_ROASTS_DIR.glob('*.alog'))
+        if not self.sample_paths:
+            self.skipTest('Sample roasts not available')
+
+        self.import_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.import_dir, ignore_errors=True)
+        for path in SAMPLE_ROASTS_DIR.iterdir():
+            shutil.copy(path, self.import_dir)
+
+        self.media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+
+    def import_roasts(self, *args):
+        out = StringIO()
+        call_command('import_roasts', str(self.import_dir), '--workers', '1', *args, stdout=out)
+        return out.getvalue()
+
+    def write_alog(self, name, **changes):
+        data = load_alog_data(self.sample_paths[0].read_bytes())
+        data.update(changes)
+        (self.import_dir / name).write_text(repr(data))
+
+    def stored_files(self):
+        return sorted(p.name for p in self.media_root.rglob('*') if p.is_file())
+
+    def test_import(self):
+        output = self.import_roasts()
+        self.assertIn('Imported: 4', output)
+        self.assertIn('Errors:   0', output)
+        self.assertEqual(Roast.objects.count(), len(self.sample_paths))
+        self.assertEqual(len(self.stored_files()), 8)
+
+    def test_missing_uuid_is_reported_per_file(self):
+        self.write_alog('NoUuid1.alog', roastUUID='')
+        self.write_alog('NoUuid2.alog', roastUUID='')
+
+        output = self.import_roasts()
+        self.assertIn('Error importing NoUuid1.alog: missing roastUUID', output)
+        self.assertIn('Error importing NoUuid2.alog: missing roastUUID', output)
+        self.assertIn('Imported: 4', output)
+        self.assertIn('Errors:   2', output)
+        self.assertFalse(Roast.objects.filter(roast_uuid='').exists())
+
+    def test_conflicting_row_does_not_sink_batch(self):
+        data = load_alog_data(self.sample_paths[0].read_bytes())
+        Roast.objects.create(
+            roast_uuid=data['roastUUID'],
+            title='Created meanwhile',
+            roast_date=date(2025, 11, 1),
+            roast_time=time(12, 0),
+            roast_epoch=0,
+        )
+
+        # Simulate the roast appearing after the existing-row lookup
+        with mock.patch.object(Roast.objects, 'in_bulk', return_value={}):
+            output = self.import_roasts()
+        self.assertIn(f'Error importing {self.sample_paths[0].name}', output)
+        self.assertIn('Imported: 3', output)
+        self.assertIn('Errors:   1', output)
+        self.assertEqual(Roast.objects.get(roast_uuid=data['roastUUID']).title, 'Created meanwhile')
+        # The failed row's files were removed again
+        self.assertNotIn(self.sample_paths[0].name, self.stored_files())
+        self.assertEqual(len(self.stored_files()), 6)
+
+    def test_duplicate_uuid_last_file_wins(self):
+        data = load_alog_data(self.sample_paths[0].read_bytes())
+        self.write_alog('ZZ_Copy.alog', title='Copy')
+
+        output = self.import_roasts()
+        self.assertIn(f'Skipping duplicate: {self.sample_paths[0].name} (same UUID as ZZ_Copy.alog)', output)
+        self.assertIn('Skipped:  1', output)
+        self.assertEqual(Roast.objects.get(roast_uuid=data['roastUUID']).title, 'Copy')
+
+    def test_existing_roasts_fetched_in_one_query(self):
+        self.import_roasts()
+        with CaptureQueriesContext(connection) as queries:
+            output = self.import_roasts('--skip-existing')
+        self.assertIn('Skipped:  4', output)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"roast_uuid" IN', queries[0]['sql'])
+
+    def test_workers(self):
+        with self.assertRaises(CommandError):
+            call_command('import_roasts', str(self.import_dir), '--workers', '0', stdout=StringIO())
+
+        pool = 'roasts.management.commands.import_roasts.ProcessPoolExecutor'
+        # A single worker parses in-process
+        with mock.patch(pool) as executor:
+            self.assertIn('Imported: 4', self.import_roasts())
+        executor.assert_not_called()
+
+        # Never more processes than files (threads stand in for processes here)
+        with mock.patch(pool, wraps=ThreadPoolExecutor) as executor:
+            out = StringIO()
+            call_command('import_roasts', str(self.import_dir), '--workers', '64', stdout=out)
+        executor.assert_called_once_with(max_workers=len(self.sample_paths))
+        self.assertIn('Imported: 4', out.getvalue())
+
+    def test_images_matched_by_stem(self):
+        with_upper, without = self.sample_paths[0], self.sample_paths[1]
+        (self.import_dir / f'{with_upper.stem}.jpg').rename(self.import_dir / f'{with_upper.stem}.JPG')
+        (self.import_dir / f'{without.stem}.jpg').unlink()
+        # Only regular files are considered
+        (self.import_dir / 'Folder.alog').mkdir()
+
+        output = self.import_roasts()
+        self.assertIn('Found 4 .alog files', output)
+        self.assertIn(f'Found image: {with_upper.stem}.JPG', output)
+        images = dict(Roast.objects.values_list('alog_file', 'image_file'))
+        self.assertEqual(sum(1 for image in images.values() if image), 3)
+        self.assertEqual(images[f'alogs/{without.name}'], '')
+
+    def test_reimport_refreshes_existing_roast(self):
+        self.import_roasts()
+        data = load_alog_data(self.sample_paths[0].read_bytes())
+        before = Roast.objects.get(roast_uuid=data['roastUUID'])
+
+        computed = {**data['computed'], 'DROP_BT': 225.0}
+        self.write_alog(self.sample_paths[0].name, title='Renamed', computed=computed)
+        output = self.import_roasts()
+        self.assertIn('Imported: 4', output)
+
+        after = Roast.objects.get(roast_uuid=data['roastUUID'])
+        self.assertEqual(Roast.objects.count(), 4)
+        self.assertEqual((after.pk, after.created_at), (before.pk, before.created_at))
+        self.assertEqual(after.title, 'Renamed')
+        self.assertEqual(after.drop_bt, 225.0)
+        self.assertEqual(after.roast_level, 'Dark')
+        self.assertGreater(after.updated_at, before.updated_at)
+        self.assertEqual(after.timex, before.timex)
+
+    def test_failed_batch_rolls_back_alone(self):
+        bulk_create = Roast.objects.bulk_create
+        calls = []
+
+        def fail_second_batch(objs, *args, **kwargs):
+            calls.append(objs)
+            if len(calls) == 2:
+                raise OperationalError('database is locked')
+            return bulk_create(objs, *args, **kwargs)
+
+        with mock.patch.dict('os.environ', {'ROAST_BULK_BATCH': '2'}), \
+                mock.patch.object(Roast.objects, 'bulk_create', side_effect=fail_second_batch):
+            output = self.import_roasts()
+        self.assertIn('Imported: 2', output)
+        self.assertIn('Errors:   2', output)
+        self.assertEqual(Roast.objects.count(), 2)
+        # Only the committed batch keeps its files
+        self.assertEqual(len(self.stored_files()), 4)
+
+    def test_failed_image_copy_drops_row_files(self):
+        store_file = ImportRoastsCommand._store_file
+        broken = f'{self.sample_paths[0].stem}.jpg'
+
+        def fail_on_image(command, path, field_file):
+            if path.name == broken:
+                raise OSError('disk full')
+            return store_file(command, path, field_file)
+
+        with mock.patch.object(ImportRoastsCommand, '_store_file', fail_on_image):
+            output = self.import_roasts()
+        self.assertIn(f'Error importing {self.sample_paths[0].name}: disk full', output)
+        self.assertIn('Imported: 3', output)
+        self.assertNotIn(self.sample_paths[0].name, self.stored_files())
+        self.assertEqual(len(self.stored_files()), 6)
+
+
+class AlogUploadTests(TestCase):
+    """Uploads stage the .alog file and move it into storage after commit"""
+
+    def setUp(self):
+        sample_paths = sorted(SAMPLE_ROASTS_DIR.glob('*.alog'))
+        if not sample_paths:
+            self.skipTest('Sample roasts not available')
+        self.alog_name = sample_paths[0].name
+        self.alog_bytes = sample_paths[0].read_bytes()
+        self.roast_uuid = load_alog_data(self.alog_bytes)['roastUUID']
+
+        self.media_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.staging_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.staging_dir, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root, ALOG_STAGING_DIR=self.staging_dir))
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('roaster'))
+
+    def upload(self, copies=1):
+        files = [SimpleUploadedFile(self.alog_name, self.alog_bytes) for _ in range(copies)]
+        return self.client.post('/api/roasts/upload/', {'alog_files': files}, format='multipart')
+
+    def create_roast(self):
+        return Roast.objects.create(
+            roast_uuid=self.roast_uuid,
+            title='HuHu200',
+            roast_date=date(2025, 11, 1),
+            roast_time=time(12, 12, 27),
+            roast_epoch=1762014784,
+        )
+
+    def staged_files(self):
+        return [p for p in self.staging_dir.rglob('*') if p.is_file()]
+
+    def test_file_stored_after_commit(self):
+        with mock.patch('roasts.views.finalize_alog_file_async', side_effect=finalize_alog_file):
+            with self.captureOnCommitCallbacks() as callbacks:
+                response = self.upload()
+            self.assertEqual(response.status_code, 201)
+            roast = Roast.objects.get(roast_uuid=self.roast_uuid)
+            self.assertEqual(roast.alog_file, '')
+            [staged_path] = self.staged_files()
+            self.assertEqual(staged_path.parent.name, str(roast.pk))
+
+            for callback in callbacks:
+                callback()
+
+        roast.refresh_from_db()
+        self.assertEqual(roast.alog_file.name, f'alogs/{self.alog_name}')
+        self.assertEqual((self.media_root / roast.alog_file.name).read_bytes(), self.alog_bytes)
+        self.assertEqual(list(self.staging_dir.iterdir()), [])
+
+    def test_duplicate_while_first_is_stored(self):
+        # The first file's background task hasn't finished yet
+        with mock.patch('roasts.views.finalize_alog_file_async') as finalize_async, \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(copies=2)
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([r['status'] for r in response.json()['results']], ['success', 'skipped'])
+        finalize_async.assert_called_once()
+        # The first upload's staged file was left alone
+        [staged_path] = self.staged_files()
+        self.assertEqual(staged_path.read_bytes(), self.alog_bytes)
+
+    def test_reattach_when_nothing_staged(self):
+        roast = self.create_roast()
+        with mock.patch('roasts.views.finalize_alog_file_async', side_effect=finalize_alog_file):
+            response = self.upload()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['results'][0]['roast_id'], str(roast.pk))
+        roast.refresh_from_db()
+        self.assertEqual(roast.alog_file.name, f'alogs/{self.alog_name}')
+
+    def test_skipped_once_attached(self):
+        roast = self.create_roast()
+        Roast.objects.filter(pk=roast.pk).update(alog_file=f'alogs/{self.alog_name}')
+        response = self.upload()
+        self.assertEqual(response.json()['results'][0]['status'], 'skipped')
+        self.assertEqual(self.staged_files(), [])
+
+    def test_stage_claims_directory(self):
+        roast = self.create_roast()
+        staged_path = stage_alog_file(roast.pk, self.alog_name, b'first')
+        with self.assertRaises(FileExistsError):
+            stage_alog_file(roast.pk, self.alog_name, b'second')
+        self.assertEqual(staged_path.read_bytes(), b'first')
+
+    def test_failed_finalize_is_retried(self):
+        roast = self.create_roast()
+        staged_path = stage_alog_file(roast.pk, self.alog_name, self.alog_bytes)
+
+        field = Roast._meta.get_field('alog_file')
+        with mock.patch.object(field.storage, 'save', side_effect=OSError('disk full')), \
+                self.assertLogs('roasts.tasks', 'ERROR'):
+            self.assertFalse(finalize_alog_file(roast.pk, staged_path))
+        self.assertTrue(staged_path.exists())
+        roast.refresh_from_db()
+        self.assertEqual(roast.alog_file, '')
+
+        self.assertEqual(finalize_staged_alog_files(), (1, 0))
+        roast.refresh_from_db()
+        self.assertEqual(roast.alog_file.name, f'alogs/{self.alog_name}')
+        self.assertEqual(list(self.staging_dir.iterdir()), [])
+
+    def test_finalize_drops_unneeded_file(self):
+        roast = self.create_roast()
+        Roast.objects.filter(pk=roast.pk).update(alog_file='alogs/other.alog')
+        staged_path = stage_alog_file(roast.pk, self.alog_name, self.alog_bytes)
+
+        self.assertTrue(finalize_alog_file(roast.pk, staged_path))
+        roast.refresh_from_db()
+        self.assertEqual(roast.alog_file.name, 'alogs/other.alog')
+        self.assertFalse((self.media_root / 'alogs' / self.alog_name).exists())
+        self.assertFalse(staged_path.parent.exists())
@@ -5,13 +5,28 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Q
-from django.core.files.base import ContentFile
+from django.db.models import Count, Max, Q
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from functools import partial
 import os
 
-from .models import Roast
+from .models import ROAST_LEVELS, Roast
 from .serializers import RoastListSerializer, RoastDetailSerializer, RoastUploadSerializer
 from .parsers import parse_alog_content
+from .tasks import discard_staged_alog_file, finalize_alog_file_async, stage_alog_file
+
+
+# Columns selected (as plain dicts) for RoastListSerializer
+LIST_FIELDS = (
+    'id', 'roast_uuid', 'title', 'roast_date', 'roast_time', 'beans',
+    'weight_in', 'operator', 'drop_bt', 'total_time', 'roast_level',
+    'image_file', 'created_at',
+)
+
+# Lowercase query values (e.g. 'medium-light') to stored roast_level labels
+ROAST_LEVEL_LOOKUP = {level.lower(): level for level in ROAST_LEVELS}
 
 
 class RoastViewSet(viewsets.ModelViewSet):
@@ -31,12 +46,59 @@ class RoastViewSet(viewsets.ModelViewSet):
             return RoastListSerializer
         return RoastDetailSerializer
 
+    def list(self, request, *args, **kwargs):
+        """List roasts, answering 304 when nothing in the filtered set has changed"""
+        queryset = self.filter_queryset(self.get_queryset())
+        state = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('pk'))
+
+        # The count catches deletions, which don't move max(updated_at)
+        last_modified = state['last_modified']
+        etag = f"{state['count']}-{last_modified.timestamp() if last_modified else 0}"
+
+        return self._conditional_response(
+            request, etag, last_modified, lambda: super(RoastViewSet, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a roast, answering 304 when it hasn't changed"""
+        instance = self.get_object()
+
+        def render():
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data)
+
+        return self._conditional_response(
+            request, str(instance.updated_at.timestamp()), instance.updated_at, render
+        )
+
+    def _conditional_response(self, request, etag, last_modified, get_response):
+        """
+        Honor If-None-Match / If-Modified-Since before building the response,
+        and attach ETag / Last-Modified to it
+        """
+        etag = quote_etag(etag)
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = get_response()
+
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
     def get_queryset(self):
         """
         Filter queryset based on query parameters
         """
         queryset = super().get_queryset()
 
+        # The list view only needs a few scalar columns; fetch them as dicts
+        # instead of building full Roast instances
+        if self.action == 'list':
+            queryset = queryset.values(*LIST_FIELDS)
+
         # Date range filtering
         date_from = self.request.query_params.get('date_from', None)
         date_to = self.request.query_params.get('date_to', None)
@@ -51,19 +113,11 @@ class RoastViewSet(viewsets.ModelViewSet):
         if beans:
             queryset = queryset.filter(beans__icontains=beans)
 
-        # Roast level filtering (by drop_bt temperature)
+        # Roast level filtering (stored from drop_bt temperature on save)
         roast_level = self.request.query_params.get('roast_level', None)
-        if roast_level:
-            level_ranges = {
-                'light': (0, 196),
-                'medium-light': (196, 205),
-                'medium': (205, 213),
-                'medium-dark': (213, 221),
-                'dark': (221, 300),
-            }
-            if roast_level.lower() in level_ranges:
-                min_temp, max_temp = level_ranges[roast_level.lower()]
-                queryset = queryset.filter(drop_bt__gte=min_temp, drop_bt__lt=max_temp)
+        if roast_level and roast_level.lower() in ROAST_LEVEL_LOOKUP:
+            # Exact match on the canonical label so the roast_level index is used
+            queryset = queryset.filter(roast_level=ROAST_LEVEL_LOOKUP[roast_level.lower()])
 
         return queryset
 
@@ -97,10 +151,10 @@ class RoastViewSet(viewsets.ModelViewSet):
                 results.append(result)
                 continue
 
-            # Read and parse .alog file
+            # Read the upload once; the same bytes are parsed and then stored
             try:
-                alog_content = alog_file.read().decode('utf-8')
-                parsed_data = parse_alog_content(alog_content)
+                alog_bytes = alog_file.read()
+                parsed_data = parse_alog_content(alog_bytes)
 
                 if not parsed_data:
                     result['status'] = 'error'
@@ -110,26 +164,46 @@ class RoastViewSet(viewsets.ModelViewSet):
 
                 # Check if roast with this UUID already exists
                 roast_uuid = parsed_data.get('roast_uuid')
-                if roast_uuid and Roast.objects.filter(roast_uuid=roast_uuid).exists():
+                existing = None
+                if roast_uuid:
+                    existing = Roast.objects.filter(roast_uuid=roast_uuid).only('id', 'alog_file').first()
+
+                # The .alog file is staged on disk, then moved into storage in the
+                # background once the row is committed, so the response doesn't
+                # wait on storage I/O
+                staged_path = None
+                if existing and not existing.alog_file:
+                    # An earlier upload created the row but its file never reached
+                    # storage; attach this one unless another upload is storing one
+                    staged_path = self._claim_alog_file(existing.id, alog_file.name, alog_bytes)
+                if existing and not staged_path:
                     result['status'] = 'skipped'
                     result['error'] = f'Roast with UUID {roast_uuid} already exists'
                     results.append(result)
                     continue
 
-                # Create Roast instance
-                roast = Roast(**parsed_data)
-
-                # Save .alog file
-                alog_file.seek(0)  # Reset file pointer
-                roast.alog_file.save(alog_file.name, ContentFile(alog_file.read()), save=False)
-
-                roast.save()
+                if existing:
+                    roast_id = existing.id
+                    finalize_alog_file_async(roast_id, staged_path)
+                else:
+                    roast = Roast(**parsed_data)
+                    roast_id = roast.id
+                    staged_path = stage_alog_file(roast_id, alog_file.name, alog_bytes)
+                    try:
+                        with transaction.atomic():
+                            roast.save()
+                            transaction.on_commit(
+                                partial(finalize_alog_file_async, roast_id, staged_path)
+                            )
+                    except Exception:
+                        discard_staged_alog_file(staged_path)
+                        raise
 
                 # Return created roast data
                 result['status'] = 'success'
-                result['roast_id'] = str(roast.id)
-                result['title'] = roast.title
-                result['roast_date'] = str(roast.roast_date)
+                result['roast_id'] = str(roast_id)
+                result['title'] = parsed_data['title']
+                result['roast_date'] = str(parsed_data['roast_date'])
                 results.append(result)
 
             except Exception as e:
@@ -161,3 +235,19 @@ class RoastViewSet(viewsets.ModelViewSet):
             response_status = status.HTTP_207_MULTI_STATUS
 
         return Response(response_data, status=response_status)
+
+    def _claim_alog_file(self, roast_id, filename, content):
+        """
+        Stage a file for a roast that has none, or return None if it can't take one
+
+        Staging fails if another upload's file is still waiting to be stored. The
+        recheck covers a background task that finished since the caller's lookup.
+        """
+        try:
+            staged_path = stage_alog_file(roast_id, filename, content)
+        except FileExistsError:
+            return None
+        if Roast.objects.filter(pk=roast_id).exclude(alog_file='').exists():
+            discard_staged_alog_file(staged_path)
+            return None
+        return staged_path